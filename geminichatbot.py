@@ -1,9 +1,14 @@
 import streamlit as st
 from dotenv import load_dotenv
 import os
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import uuid
+import diskcache
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder # Import MessagesPlaceholder
 from langchain_core.output_parsers import StrOutputParser
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage # Typed messages for the LLM history
 from datetime import datetime # Needed for dynamic date in system prompt
 
 # --- Configuration & Setup ---
@@ -12,16 +17,180 @@ from datetime import datetime # Needed for dynamic date in system prompt
 load_dotenv()
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
+# Default number of past messages (user + AI) sent to the LLM on each turn
+# Capping the history bounds the prompt size, and therefore response latency, regardless of session length
+MAX_HISTORY_MESSAGES = 16
+
+# Number of most recent chat messages rendered directly on each rerun
+RECENT_MESSAGES_SHOWN = 40
+
+# A repeated question within this many seconds is treated as an accidental resubmission
+DUPLICATE_PROMPT_WINDOW_SECONDS = 10
+# Prompts shorter than this (e.g. "continue", "more") are always answered again
+MIN_DEDUP_PROMPT_CHARS = 16
+
+# Saved chat histories are removed from disk after 30 days
+CHAT_HISTORY_TTL = 30 * 24 * 60 * 60
+
 # Set Streamlit page configuration
 st.set_page_config(page_title="🌌 Gemini Chatbot", page_icon="✨", layout="centered")
 
+# --- Persistent Chat Store ---
+# Chat history lives on disk keyed by an id kept in the page URL (?sid=...), so it survives reloads
+# and doesn't have to be held only in process memory
+# Streamlit's own session id can't be used here, it changes on every reload
+@st.cache_resource
+def get_store() -> diskcache.Cache:
+    return diskcache.Cache("./.chatcache")
+
+def chat_key():
+    if "sid" not in st.query_params:
+        st.query_params["sid"] = uuid.uuid4().hex
+    return f"chat:{st.query_params['sid']}"
+
+def save_chat_history():
+    # The running summary is saved with the history, so a reload doesn't have to re-summarize everything
+    get_store().set(chat_key(), {
+        "lc_history": st.session_state.lc_history,
+        "history_summary": st.session_state.history_summary,
+        "summarized_count": st.session_state.summarized_count
+    }, expire=CHAT_HISTORY_TTL)
+
 # Initialize chat history and temperature in session state
 # st.session_state is crucial for maintaining state across reruns
+if "lc_history" not in st.session_state:
+    # History in LangChain message format, appended to once per turn
+    # Loaded from the store only once per session, together with its running summary
+    saved_chat = get_store().get(chat_key(), {})
+    st.session_state.lc_history = saved_chat.get("lc_history", [])
+    st.session_state.history_summary = saved_chat.get("history_summary", "")
+    st.session_state.summarized_count = saved_chat.get("summarized_count", 0)
 if "messages" not in st.session_state:
+    # Parallel list of dicts, kept only for rendering the UI
     st.session_state.messages = [{"role": "system_welcome", "content": "Hello! How can I assist you today?"}] # Initial welcome message
+    st.session_state.messages += [
+        {"role": "user" if isinstance(msg, HumanMessage) else "ai", "content": msg.content}
+        for msg in st.session_state.lc_history
+    ]
+if "history_window" not in st.session_state:
+    st.session_state.history_window = MAX_HISTORY_MESSAGES
+if "summarize_history" not in st.session_state:
+    st.session_state.summarize_history = False # Optional running summary of turns outside the window
+if "summary_job" not in st.session_state:
+    # history_summary (condensed text of older turns) and summarized_count (how many lc_history messages
+    # are already folded into it) are loaded with the history above
+    st.session_state.summary_job = None # (Future, message count) of a summary being built in the background
+if "last_prompt_hash" not in st.session_state:
+    # Fingerprint of the previous question, used to ignore accidental double submissions
+    st.session_state.last_prompt_hash = None
+    st.session_state.last_prompt_time = 0.0
 if "temperature" not in st.session_state:
     st.session_state.temperature = 0.7 # Default creativity setting
 
+# --- LLM Setup (Cached) ---
+# st.cache_resource keeps one client per temperature alive across reruns,
+# so the HTTP connection pool is reused instead of rebuilt on every turn
+@st.cache_resource
+def get_llm(temperature: float):
+    # Imported here rather than at the top: the Gemini SDK is heavy and only needed once a question is asked
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.0-flash",
+        google_api_key=GOOGLE_API_KEY,
+        temperature=temperature
+    )
+
+@st.cache_resource
+def build_system_prompt(date_str: str) -> str:
+    # Identical text for the whole day, so every turn (and every user) sends the same prompt prefix
+    # and the provider can reuse its cached work for it
+    return f"You are a friendly and helpful chatbot. Your responses should be concise and direct. Current date is {date_str}."
+
+@st.cache_resource
+def build_prompt(date_str: str) -> ChatPromptTemplate:
+    # Define the prompt for the chatbot, now capable of handling conversation history
+    # MessagesPlaceholder allows passing a list of messages directly
+    # Keyed by the date string so the same template object is reused for the whole day
+    return ChatPromptTemplate.from_messages(
+        [
+            ("system", build_system_prompt(date_str)),
+            MessagesPlaceholder(variable_name="chat_history"), # This placeholder will receive the past messages
+            ("human", "{question}") # The current question from the user
+        ]
+    )
+
+@st.cache_resource
+def get_chain(temperature: float, date_str: str):
+    output_parser = StrOutputParser()
+    return build_prompt(date_str) | get_llm(temperature) | output_parser
+
+@st.cache_resource
+def get_summary_chain():
+    # Condenses turns that fell out of the history window into a short running summary
+    # Uses temperature 0 so the summary stays factual
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", "Summarize the conversation below in a few sentences, keeping names, facts and decisions. Extend the existing summary if one is given."),
+            ("human", "Existing summary:\n{summary}\n\nNew messages:\n{messages}")
+        ]
+    )
+    return prompt | get_llm(0.0) | StrOutputParser()
+
+# Summaries are built on a background thread after the answer is shown, so they never delay the next response
+@st.cache_resource
+def get_summary_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=2)
+
+def summarize_messages(summary_chain, summary, messages):
+    # Runs on the background thread, so it only works with its arguments, never st.session_state
+    transcript = "\n".join(
+        f"{'User' if isinstance(msg, HumanMessage) else 'AI'}: {msg.content}" for msg in messages
+    )
+    return summary_chain.invoke({"summary": summary or "(none)", "messages": transcript})
+
+def schedule_history_summary(older_messages):
+    # Only fold in messages that haven't been summarized yet, so the LLM is called once per evicted turn
+    new_messages = older_messages[st.session_state.summarized_count:]
+    if not new_messages or st.session_state.summary_job is not None:
+        return
+    future = get_summary_executor().submit(
+        summarize_messages, get_summary_chain(), st.session_state.history_summary, new_messages
+    )
+    st.session_state.summary_job = (future, len(older_messages))
+
+def collect_history_summary():
+    # Picks up a finished background summary; one still running is simply used on a later turn
+    job = st.session_state.summary_job
+    if job is None or not job[0].done():
+        return
+    st.session_state.summary_job = None
+    future, summarized_count = job
+    if future.exception() is None: # A failed summary is retried on the next turn
+        st.session_state.history_summary = future.result()
+        st.session_state.summarized_count = summarized_count
+
+def coalesce(stream, min_chars=24, max_ms=25):
+    # Groups tiny streamed chunks into larger ones before they reach st.write_stream
+    # A chunk is flushed once it is long enough, ends a line or sentence, or has waited max_ms,
+    # so the page re-renders far less often while the text still appears smoothly
+    buffer = []
+    size = 0
+    started = time.monotonic()
+    for chunk in stream:
+        buffer.append(chunk)
+        size += len(chunk)
+        if (
+            size >= min_chars
+            or chunk.endswith(("\n", ".", "!", "?"))
+            or (time.monotonic() - started) * 1000 >= max_ms
+        ):
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+            started = time.monotonic()
+    if buffer:
+        yield "".join(buffer)
+
 # --- Streamlit UI Components ---
 
 st.title('🌌 Langchain AI Chatbot with Gemini Flash')
@@ -39,12 +208,22 @@ with st.sidebar:
         min_value=0.0, max_value=1.0, value=st.session_state.temperature, step=0.05,
         help="Lower values mean more focused and deterministic responses. Higher values mean more creative and diverse responses."
     )
-    # Update session state if slider value changes and trigger rerun
-    if new_temperature != st.session_state.temperature:
-        st.session_state.temperature = new_temperature
-        # st.experimental_rerun() is used to immediately apply settings changes
-        # It forces the script to rerun from top, picking up the new temperature
-        st.experimental_rerun()
+    # Update session state; no extra rerun needed since get_llm() is keyed by temperature
+    # and the next question simply picks up the matching cached client
+    st.session_state.temperature = new_temperature
+
+    # History window slider, controls how much of the conversation is sent with each question
+    st.subheader("Conversation Memory")
+    st.session_state.history_window = st.slider(
+        "Past messages sent to the AI",
+        min_value=2, max_value=50, value=st.session_state.history_window, step=2,
+        help="Only the most recent messages are sent with each question. Smaller values mean faster responses."
+    )
+    st.session_state.summarize_history = st.checkbox(
+        "Summarize older messages",
+        value=st.session_state.summarize_history,
+        help="Keeps a short summary of messages outside the window so the AI doesn't completely forget them."
+    )
 
     st.markdown("---")
     st.info("💡 Tip: Ask about anything! E.g., 'Explain quantum physics in simple terms'.")
@@ -52,11 +231,17 @@ with st.sidebar:
     # Clear chat history button
     if st.button("🚀 Clear Chat History"):
         st.session_state.messages = [{"role": "system_welcome", "content": "Hello! How can I assist you today?"}] # Reset with welcome
+        st.session_state.lc_history = []
+        get_store().delete(chat_key())
+        st.session_state.history_summary = ""
+        st.session_state.summarized_count = 0
+        st.session_state.summary_job = None
+        st.session_state.last_prompt_hash = None
         st.success("Chat history cleared!")
         st.rerun() # Rerun to update the displayed messages
 
 # Display chat messages from history on app rerun
-for message in st.session_state.messages:
+def render_message(message):
     if message["role"] == "system_welcome":
         # Display initial welcome message outside of chat bubble
         st.markdown(f"**🤖 {message['content']}**")
@@ -65,76 +250,83 @@ for message in st.session_state.messages:
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
 
+# st.fragment (Streamlit >= 1.37): flipping the "older messages" toggle reruns only this function,
+# not the whole chat script
+@st.fragment
+def render_history():
+    # Only the latest messages are rendered by default so rerun cost doesn't grow with the conversation
+    # Older ones are rendered only when asked for (the full history is still kept for the LLM context)
+    hidden_messages = st.session_state.messages[:-RECENT_MESSAGES_SHOWN]
+    if hidden_messages and st.toggle(f"Show {len(hidden_messages)} older messages", key="show_older_messages"):
+        for message in hidden_messages:
+            render_message(message)
+    for message in st.session_state.messages[-RECENT_MESSAGES_SHOWN:]:
+        render_message(message)
+
+render_history()
+
 # --- Main Chat Input ---
 # Use st.chat_input for a modern chat-like input box
 prompt_input = st.chat_input("Ask me anything...")
 
 # --- Process User Input ---
 if prompt_input:
+    # Normalized fingerprint of the question, to detect the same prompt being sent twice in a row
+    # Short prompts like "continue" or "more" are often repeated on purpose, so they're never deduplicated
+    prompt_hash = hashlib.blake2b(prompt_input.strip().casefold().encode(), digest_size=16).hexdigest()
+    is_duplicate = (
+        len(prompt_input.strip()) >= MIN_DEDUP_PROMPT_CHARS
+        and prompt_hash == st.session_state.last_prompt_hash
+        and time.monotonic() - st.session_state.last_prompt_time <= DUPLICATE_PROMPT_WINDOW_SECONDS
+    )
+
+if prompt_input and is_duplicate:
+    # Accidental resubmission: the question and its answer are already on screen, so neither
+    # Gemini is called again nor is a second identical turn added to the history
+    st.info("You just asked that, the answer is right above. ☝️")
+elif prompt_input:
     # Add user message to chat history
     st.session_state.messages.append({"role": "user", "content": prompt_input})
+    st.session_state.lc_history.append(HumanMessage(prompt_input))
     # Display user message immediately
     with st.chat_message("user"):
         st.markdown(prompt_input)
 
-    # Initialize LLM with current temperature from session state
+    # Fetch the cached LLM and chain for the current temperature from session state
     # This ensures the LLM's creativity setting is always up-to-date
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.0-flash",
-        google_api_key=GOOGLE_API_KEY,
-        temperature=st.session_state.temperature # Use the current temperature
-    )
-
-    # Define the prompt for the chatbot, now capable of handling conversation history
-    # MessagesPlaceholder allows passing a list of messages directly
-    prompt = ChatPromptTemplate.from_messages(
-        [
-            ("system", f"You are a friendly and helpful chatbot. Your responses should be concise and direct. Current date is {datetime.now().strftime('%Y-%m-%d')}."),
-            MessagesPlaceholder(variable_name="chat_history"), # This placeholder will receive the past messages
-            ("human", "{question}") # The current question from the user
-        ]
-    )
-
-    output_parser = StrOutputParser()
-    chain = prompt | llm | output_parser
+    today = datetime.now().strftime("%Y-%m-%d") # Computed once per rerun, only the day matters
+    chain = get_chain(st.session_state.temperature, today)
 
     with st.chat_message("ai"):
         with st.spinner("AI is thinking... 🤔"):
-            # Prepare chat history for the prompt
-            # We convert session_state messages into the format expected by LangChain's MessagesPlaceholder
-            # We skip the "system_welcome" message as it's not part of the actual conversation history sent to the LLM.
-            # We also exclude the *very last* user message, as it's passed separately as "question".
-            formatted_chat_history = []
-            for msg in st.session_state.messages:
-                if msg["role"] == "user":
-                    formatted_chat_history.append(("human", msg["content"]))
-                elif msg["role"] == "ai":
-                    formatted_chat_history.append(("ai", msg["content"]))
-
-            # The current prompt_input is already the last item added to st.session_state.messages as "user" role.
-            # When using MessagesPlaceholder, we typically pass the *entire* past conversation (excluding the very last user turn which is `question`).
-            # So, `chat_history_for_llm` should contain all messages *before* the current `prompt_input`.
-
-            # Refined chat history preparation:
-            # The prompt is constructed to take `chat_history` (all previous turns) and `question` (the current turn).
-            # So, `st.session_state.messages` contains all previous turns + current turn.
-            # We take all messages *except the very last one* for `chat_history`.
-            # The last one is the `prompt_input` that will be mapped to `question`.
-
-            # Filter out the initial 'system_welcome' and prepare the history for the LLM
-            llm_chat_history = []
-            for msg in st.session_state.messages[:-1]: # All messages EXCEPT the very last user input
-                if msg["role"] == "user":
-                    llm_chat_history.append(("human", msg["content"]))
-                elif msg["role"] == "ai":
-                    llm_chat_history.append(("ai", msg["content"]))
+            # lc_history is already in the format expected by LangChain's MessagesPlaceholder
+            # We exclude the *very last* user message, as it's passed separately as "question",
+            # and only keep the last `history_window` messages before it.
+            past_messages = st.session_state.lc_history[:-1]
+            window = st.session_state.history_window
+            chat_history = past_messages[-window:]
 
+            # Optionally prepend the running summary of the turns that fell out of the window
+            # It was prepared in the background after earlier answers, so there's no extra LLM call here
+            collect_history_summary()
+            if st.session_state.summarize_history and past_messages[:-window] and st.session_state.history_summary:
+                chat_history = [SystemMessage(f"Summary so far: {st.session_state.history_summary}")] + chat_history
 
             response_stream = chain.stream({
-                'chat_history': llm_chat_history,
+                'chat_history': chat_history,
                 'question': prompt_input # The current question from the st.chat_input
             })
-            full_response = st.write_stream(response_stream) # Stream output for better UX
+            full_response = st.write_stream(coalesce(response_stream)) # Stream output for better UX
 
     # Add AI response to chat history
-    st.session_state.messages.append({"role": "ai", "content": full_response})
\ No newline at end of file
+    st.session_state.messages.append({"role": "ai", "content": full_response})
+    st.session_state.lc_history.append(AIMessage(full_response))
+
+    # Summarize whatever the window will drop on the next turn, off the critical path of this one
+    if st.session_state.summarize_history:
+        collect_history_summary()
+        schedule_history_summary(st.session_state.lc_history[:-st.session_state.history_window])
+    save_chat_history()
+
+    st.session_state.last_prompt_hash = prompt_hash
+    st.session_state.last_prompt_time = time.monotonic()
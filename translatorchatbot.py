@@ -1,11 +1,60 @@
 import os
+import asyncio
+import collections
+import threading
+import uuid
+import importlib.util
+import httpx
 import streamlit as st
+import diskcache
 from dotenv import load_dotenv
-from langchain_core.output_parsers import StrOutputParser
-from langchain_groq import ChatGroq
+from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.exceptions import OutputParserException
 from datetime import datetime # Added for timestamps in history
 
+# Supported target languages, sorted alphabetically once at import for better user experience
+LANGUAGES = tuple(sorted([
+    "English", "Urdu", "German", "French", "Spanish", "Arabic",
+    "Hindi", "Chinese", "Russian", "Turkish", "Japanese", "Italian", "Portuguese", "Korean", "Vietnamese", "Dutch", "Swedish"
+]))
+
+# ISO 639-1 codes (as reported by langdetect) for each supported language
+LANGUAGE_CODES = {
+    "ar": "Arabic", "zh-cn": "Chinese", "zh-tw": "Chinese", "nl": "Dutch", "en": "English",
+    "fr": "French", "de": "German", "hi": "Hindi", "it": "Italian", "ja": "Japanese",
+    "ko": "Korean", "pt": "Portuguese", "ru": "Russian", "es": "Spanish", "sv": "Swedish",
+    "tr": "Turkish", "ur": "Urdu", "vi": "Vietnamese"
+}
+# Language detection is only trusted on reasonably long inputs with a confident guess
+MIN_DETECTION_CHARS = 8
+MIN_DETECTION_CONFIDENCE = 0.9
+
+# Maximum number of translations kept in the on-screen history; older ones are dropped
+MAX_TRANSLATIONS = 50
+# How many of those are rendered directly; the rest are behind an expander
+RECENT_TRANSLATIONS_SHOWN = 20
+
+# Cached translations and saved histories expire after 30 days
+TRANSLATION_CACHE_TTL = 30 * 24 * 60 * 60
+
+# Cosine similarity above which two inputs are treated as the same text (e.g. "Hello world" vs "hello world!")
+SEMANTIC_CACHE_THRESHOLD = 0.97
+# Most recent texts kept in the in-memory semantic index per target language
+SEMANTIC_CACHE_SIZE = 1000
+
+# Input limits: long texts mean a long prompt and an even longer translation to generate
+MAX_INPUT_CHARS = 4000
+MAX_INPUT_TOKENS = 3000
+# Upper bound for the translated output, in tokens
+MAX_OUTPUT_TOKENS = 2048
+# Output tokens per input token to allow for; non-Latin scripts often take 2-4x the tokens of the source
+OUTPUT_TOKEN_RATIO = 1.5
+WIDE_SCRIPT_OUTPUT_TOKEN_RATIO = 4
+WIDE_SCRIPT_LANGUAGES = {"Arabic", "Chinese", "Hindi", "Japanese", "Korean", "Russian", "Urdu"}
+# Upper bound for a batched multi-language response, which holds one translation per language
+MAX_BATCH_OUTPUT_TOKENS = 4096
+
 # Load environment variables from .env
 load_dotenv()
 
@@ -18,10 +67,32 @@ st.set_page_config(
     initial_sidebar_state="expanded" # Sidebar starts open
 )
 
+# --- Persistent Store ---
+# Translation cache and history persisted on disk, so identical texts are never sent to Groq twice
+# The history is keyed by an id kept in the page URL (?sid=...), so it survives reloads
+# Streamlit's own session id can't be used here, it changes on every reload
+@st.cache_resource
+def get_translation_store() -> diskcache.Cache:
+    return diskcache.Cache("./.translation_cache")
+
+def history_key():
+    if "sid" not in st.query_params:
+        st.query_params["sid"] = uuid.uuid4().hex
+    return f"translations:{st.query_params['sid']}"
+
+def save_translation_history():
+    get_translation_store().set(history_key(), list(st.session_state.translations), expire=TRANSLATION_CACHE_TTL)
+
 # --- Session State Initialization ---
 # This is crucial for maintaining translation history across reruns
 if "translations" not in st.session_state:
-    st.session_state.translations = []
+    # deque gives O(1) prepend with appendleft and keeps memory bounded
+    # Restored from disk once per session (e.g. after a reload), see save_translation_history()
+    st.session_state.translations = collections.deque(
+        get_translation_store().get(history_key(), []), maxlen=MAX_TRANSLATIONS
+    )
+if "input_text" not in st.session_state:
+    st.session_state.input_text = ""
 
 # --- Sidebar for Info and Settings ---
 with st.sidebar:
@@ -62,7 +133,8 @@ with st.sidebar:
     # Corrected Indentation: This 'if' statement is now correctly indented with 4 spaces
     if st.button("🗑️ Clear All Translations", use_container_width=True):
         # Corrected Indentation: These lines are now correctly indented with 8 spaces
-        st.session_state.translations = [] # Reset the history list
+        st.session_state.translations.clear() # Reset the history
+        save_translation_history()
         st.success("Translation history cleared!")
         st.rerun() # Correctly using st.rerun()
 
@@ -70,109 +142,440 @@ with st.sidebar:
     st.caption("Developed with ❤️ using Streamlit, Langchain, and Groq.")
 
 
+# --- HTTP Clients ---
+# Shared, long-lived HTTP clients so TLS sessions and connections are reused between requests
+# HTTP/2 also multiplexes concurrent requests over a single connection; it needs the optional
+# `h2` package (pip install httpx[http2]), without it the clients fall back to HTTP/1.1
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+@st.cache_resource
+def get_http_client() -> httpx.Client:
+    return httpx.Client(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+        timeout=HTTP_TIMEOUT,
+    )
+
+@st.cache_resource
+def get_async_http_client() -> httpx.AsyncClient:
+    # Pooled async client so concurrent requests share keep-alive connections
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        timeout=HTTP_TIMEOUT,
+    )
+
 # --- LLM Setup (Groq Model) ---
 # Initialize the ChatGroq model with your API key and chosen parameters
-llm = ChatGroq(
-    model_name="llama3-8b-8192", # Recommended for speed and quality
-    groq_api_key=os.getenv("GROQ_API_KEY"), # Fetches API key from .env file
-    temperature=0, # Low temperature for accurate, deterministic translation
-    max_tokens=None, # Allow model to determine response length based on context
-    timeout=None,
-    max_retries=2,
-)
+# st.cache_resource keeps one client per streaming mode (sharing the HTTP connection pools) alive across reruns
+@st.cache_resource
+def get_groq_llm(streaming: bool = True):
+    # Imported here rather than at the top: the Groq SDK is heavy and only needed for the first translation
+    from langchain_groq import ChatGroq
+    return ChatGroq(
+        model_name="llama3-8b-8192", # Recommended for speed and quality
+        groq_api_key=os.getenv("GROQ_API_KEY"), # Fetches API key from .env file
+        temperature=0, # Low temperature for accurate, deterministic translation
+        max_tokens=None, # Set per request from the input length, see output_token_budget()
+        timeout=HTTP_TIMEOUT, # Per-request timeout; None would disable it and let a stalled call hang forever
+        max_retries=2,
+        streaming=streaming, # Tokens are rendered as they arrive instead of after the full response
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+    )
+
+# --- Async Runtime ---
+# One long-lived event loop in a background thread, shared across reruns
+# The async HTTP client's connections stay bound to this loop, so they can be reused between clicks
+@st.cache_resource
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+def run_async(coro):
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
 
 # --- Langchain Components ---
-# Define the prompt template for translation
+# Define the prompt template for translation once per process; it is fully static
 # The system message guides the AI's behavior
 # The human message defines the specific task and input variables
-prompt = ChatPromptTemplate.from_messages([
+PROMPT = ChatPromptTemplate.from_messages([
     ("system", "You are a helpful and highly accurate language translator. Your sole purpose is to translate the provided text from any language to the target language. Provide only the translated text, do not add any extra explanations or conversational filler. If the source language is the same as the target language, simply return the input text as is."),
     ("human", "Translate the following text to {target_language}: {input}"),
 ])
 
-# Output parser to get string response from LLM
-output_parser = StrOutputParser()
+# Prompt for translating into several languages in a single call
+# The text is only sent (and processed) once, and the model answers with one JSON object
+BATCH_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a helpful and highly accurate language translator. You always answer with a single JSON object and nothing else. If the source language is the same as a target language, use the input text as is for that language."),
+    ("human", "Return a JSON object with keys = target languages and values = translations. Languages: {targets}. Text: {input}"),
+])
+
+# --- Length Guardrails ---
+# Tokenizer used to estimate input size; cl100k_base is close enough to Llama 3 for budgeting
+# Returns None if tiktoken isn't installed or its encoding file can't be downloaded
+@st.cache_resource
+def get_encoder():
+    try:
+        import tiktoken # Deferred like the LLM imports, it's only needed once text is submitted
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+def count_tokens(text):
+    encoder = get_encoder()
+    if encoder is None:
+        return len(text) // 4 # Rough estimate (~4 characters per token) rather than blocking translation
+    return len(encoder.encode(text))
+
+def output_token_budget(input_tokens, target_language):
+    # Allow headroom over the source length (more for non-Latin scripts), but never unbounded decoding
+    ratio = WIDE_SCRIPT_OUTPUT_TOKEN_RATIO if target_language in WIDE_SCRIPT_LANGUAGES else OUTPUT_TOKEN_RATIO
+    return min(max(128, int(input_tokens * ratio) + 64), MAX_OUTPUT_TOKENS)
+
+def get_translation_chain(input_tokens, target_language):
+    # Combine prompt and cached LLM into a Langchain chain
+    # max_tokens is bound per request so the cached client isn't rebuilt
+    # No output parser: the message metadata is needed to tell whether the output was cut off
+    max_tokens = output_token_budget(input_tokens, target_language)
+    return PROMPT | get_groq_llm().bind(max_tokens=max_tokens)
 
-# Combine prompt, LLM, and parser into a Langchain chain
-chain = prompt | llm | output_parser
+def hit_length_limit(response_metadata):
+    # Groq reports finish_reason "length" when generation stopped at max_tokens
+    return response_metadata.get("finish_reason") == "length"
+
+def stream_text(message_stream, response_metadata):
+    # Yields the text of each streamed message chunk, collecting the metadata (e.g. finish_reason) on the way
+    for chunk in message_stream:
+        response_metadata.update(chunk.response_metadata)
+        yield chunk.content
+
+# --- Translation Cache ---
+# Exact matches and the semantic cache both live in the disk store, so they're shared across sessions
+# Sentence embedder for the semantic cache, loaded once per process
+# Returns None if sentence-transformers isn't installed, which disables the semantic lookup
+@st.cache_resource
+def get_embedder():
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        return None
+    return SentenceTransformer("all-MiniLM-L6-v2")
+
+# --- Source Language Detection ---
+# Cheap local check so text that is already in the target language never reaches the API
+# Returns None if langdetect isn't installed, which always falls back to the LLM
+@st.cache_resource
+def get_detector():
+    try:
+        from langdetect import DetectorFactory, detect_langs
+    except ImportError:
+        return None
+    DetectorFactory.seed = 0 # Make detection deterministic
+    return detect_langs
+
+def detect_language(text):
+    detector = get_detector()
+    sample = text.strip()[:512]
+    if detector is None or len(sample) < MIN_DETECTION_CHARS:
+        return None
+    try:
+        best = detector(sample)[0]
+    except Exception: # langdetect raises on text without any letters (numbers, emoji, ...)
+        return None
+    if best.prob < MIN_DETECTION_CONFIDENCE:
+        return None
+    return LANGUAGE_CODES.get(best.lang)
+
+def cache_key(target_language, text):
+    return (target_language, text.strip().casefold())
+
+def semantic_cache_key(target_language, text):
+    # One small (embedding, output) row per translated text, appended without rewriting anything else
+    return ("semantic", target_language, text.strip().casefold())
+
+def embed(text):
+    embedder = get_embedder()
+    if embedder is None:
+        return None
+    return embedder.encode(text, normalize_embeddings=True)
+
+def add_semantic_row(index, target_language, embedding, output):
+    import numpy as np # Only the semantic cache needs numpy, and it ships with sentence-transformers
+    entry = index["languages"].setdefault(
+        target_language, {"embeddings": np.empty((0, embedding.shape[0]), dtype=embedding.dtype), "outputs": []}
+    )
+    entry["embeddings"] = np.vstack([entry["embeddings"], embedding])[-SEMANTIC_CACHE_SIZE:]
+    entry["outputs"] = (entry["outputs"] + [output])[-SEMANTIC_CACHE_SIZE:]
+
+# In-process semantic index shared by all sessions: per target language, a matrix of normalized
+# input embeddings (one row each) and their translated outputs
+# Built from the disk rows once per process, then kept up to date in memory by store_translation()
+@st.cache_resource
+def get_semantic_index():
+    index = {"lock": threading.Lock(), "languages": {}}
+    store = get_translation_store()
+    for key in store.iterkeys():
+        if isinstance(key, tuple) and len(key) == 3 and key[0] == "semantic":
+            row = store.get(key) # None if it expired in the meantime
+            if row is not None:
+                add_semantic_row(index, key[1], *row)
+    return index
+
+def lookup_translation(target_language, text):
+    # Exact match on the normalized text; cheap, so it's always tried before embedding anything
+    return get_translation_store().get(cache_key(target_language, text))
+
+def lookup_similar_translation(target_language, query):
+    # `query` is the embedding of the input from embed(), computed once per request on an exact-match miss
+    # Semantic match: a single matmul of the query against all cached embeddings for this language
+    if query is None:
+        return None
+    import numpy as np
+    index = get_semantic_index()
+    with index["lock"]:
+        entry = index["languages"].get(target_language)
+        if entry is None:
+            return None
+        similarities = entry["embeddings"] @ query
+        best = int(np.argmax(similarities))
+        if similarities[best] >= SEMANTIC_CACHE_THRESHOLD:
+            return entry["outputs"][best]
+    return None
+
+def store_translation(target_language, text, output, query):
+    store = get_translation_store()
+    store.set(cache_key(target_language, text), output, expire=TRANSLATION_CACHE_TTL)
+
+    if query is None:
+        return
+    store.set(semantic_cache_key(target_language, text), (query, output), expire=TRANSLATION_CACHE_TTL)
+    index = get_semantic_index()
+    with index["lock"]:
+        add_semantic_row(index, target_language, query, output)
+
+async def translate_many(text, target_languages, input_tokens):
+    # Fan out one request per language; each call is I/O-bound so they overlap on the network
+    # A failed language (e.g. rate limited) comes back as its exception instead of discarding the others
+    return await asyncio.gather(*[
+        get_translation_chain(input_tokens, language).ainvoke({"target_language": language, "input": text})
+        for language in target_languages
+    ], return_exceptions=True)
+
+def batch_token_budget(input_tokens, target_languages):
+    return sum(output_token_budget(input_tokens, language) for language in target_languages)
+
+def translate_batch(text, target_languages, input_tokens):
+    # One request for all target languages; JSON mode makes Llama 3 return a parseable object
+    # JSON mode needs the complete response, so this uses the non-streaming client
+    llm = get_groq_llm(streaming=False).bind(
+        max_tokens=batch_token_budget(input_tokens, target_languages),
+        response_format={"type": "json_object"}
+    )
+    chain = BATCH_PROMPT | llm | JsonOutputParser()
+    # Groq rejects invalid or truncated JSON itself (HTTP 400 json_validate_failed), so both errors are expected
+    from groq import BadRequestError # Deferred like the ChatGroq import in get_groq_llm()
+    try:
+        return chain.invoke({"targets": ", ".join(target_languages), "input": text})
+    except (OutputParserException, BadRequestError):
+        # Invalid or truncated JSON: return nothing so every language is retried individually
+        return {}
+
+def clear_input():
+    # Widget state can only be changed from a callback, before the text area is drawn again
+    st.session_state.input_text = ""
 
 # --- Main UI Elements ---
 st.header('⚡ Instant Language Translator with Groq')
 st.write("Enter text below, select your target language, and get a quick translation!")
 
 # Input area for text to be translated
+# Bound to st.session_state.input_text so it can be cleared without a full extra rerun
 input_text = st.text_area(
     "✍️ Enter text here:",
+    key="input_text",
     height=150,
+    max_chars=MAX_INPUT_CHARS, # Also shows a character counter under the box
     placeholder="Type or paste your text to translate..."
 )
 
 # Language selection dropdown
-languages = [
-    "English", "Urdu", "German", "French", "Spanish", "Arabic",
-    "Hindi", "Chinese", "Russian", "Turkish", "Japanese", "Italian", "Portuguese", "Korean", "Vietnamese", "Dutch", "Swedish" # Expanded list
-]
-languages.sort() # Sort alphabetically for better user experience
 selected_language = st.selectbox(
     "🎯 Select language to translate to:",
-    languages,
-    index=languages.index("English") if "English" in languages else 0 # Default to English if available
+    LANGUAGES,
+    index=LANGUAGES.index("English") # Default to English
 )
 
+# Optionally translate into several languages with a single request
+multi_languages = st.multiselect(
+    "🌐 Translate to multiple languages (optional):",
+    LANGUAGES,
+    help="When languages are picked here, they are used instead of the single language above."
+)
+
+# Translate the same text into every supported language at once
+translate_all = st.checkbox("🌍 Translate to all languages")
+
 # Buttons for actions
 col1, col2 = st.columns([1, 1]) # Use columns for layout
 with col1:
     translate_button = st.button("🚀 Translate!", use_container_width=True)
 with col2:
-    if st.button("🔄 Clear Input", use_container_width=True):
-        input_text = "" # This will clear the text area on next rerun
-        st.rerun() # Correctly using st.rerun()
+    # The callback runs before the rerun triggered by the click itself, so no st.rerun() is needed
+    st.button("🔄 Clear Input", use_container_width=True, on_click=clear_input)
 
 # --- Translation Logic ---
-if translate_button and input_text:
-    with st.spinner(f"Translating to {selected_language}... ⏳"):
-        try:
-            # Invoke the Langchain chain with the user's input and selected language
-            response = chain.invoke({
-                "target_language": selected_language,
-                "input": input_text
-            })
+if translate_button and not input_text:
+    st.warning("Please enter some text to translate before clicking 'Translate'!")
+elif translate_button:
+    try:
+        input_tokens = count_tokens(input_text)
+        if input_tokens > MAX_INPUT_TOKENS:
+            st.error(f"Your text is too long (~{input_tokens} tokens). Please shorten it to under {MAX_INPUT_TOKENS} tokens.")
+
+        elif translate_all or multi_languages:
+            target_languages = LANGUAGES if translate_all else tuple(multi_languages)
+            truncated = []
+            failed = []
+            with st.spinner(f"Translating to {len(target_languages)} languages... ⏳"):
+                # Serve what we can from the cache and only send the rest to Groq
+                results = {language: lookup_translation(language, input_text) for language in target_languages}
+                # Only on an exact-match miss is the input embedded, once, and reused for every language
+                query = embed(input_text) if None in results.values() else None
+                for language, output in results.items():
+                    if output is None:
+                        results[language] = lookup_similar_translation(language, query)
+                # The source language needs no translation at all
+                source_language = detect_language(input_text)
+                if source_language in results:
+                    results[source_language] = input_text
+                missing = [language for language, output in results.items() if output is None]
+
+                # A handful of languages fit in one batched JSON response; translating to all of them,
+                # or a long text, would overflow the output budget, so those are fanned out concurrently instead
+                if missing and not translate_all and batch_token_budget(input_tokens, missing) <= MAX_BATCH_OUTPUT_TOKENS:
+                    batched = translate_batch(input_text, missing, input_tokens)
+                    for language in missing:
+                        if isinstance(batched, dict) and isinstance(batched.get(language), str):
+                            store_translation(language, input_text, batched[language], query)
+                            results[language] = batched[language]
+                    # Anything the model left out of the JSON object (or all of it, if unparseable) is retried individually
+                    missing = [language for language, output in results.items() if output is None]
+                if missing:
+                    for language, message in zip(missing, run_async(translate_many(input_text, missing, input_tokens))):
+                        if isinstance(message, Exception):
+                            failed.append(language)
+                            continue
+                        results[language] = message.content
+                        # Output cut off at max_tokens is shown but never cached
+                        if hit_length_limit(message.response_metadata):
+                            truncated.append(language)
+                        else:
+                            store_translation(language, input_text, message.content, query)
+
+            # Store every translation in session state for history display
+            timestamp = datetime.now().strftime("%I:%M %p, %b %d, %Y")
+            for language in reversed(target_languages): # Reversed so the history shows them in the selected order
+                if results[language] is None: # Failed above, nothing to show
+                    continue
+                st.session_state.translations.appendleft({
+                    "input": input_text,
+                    "output": results[language],
+                    "target_lang": language,
+                    "timestamp": timestamp
+                })
+            save_translation_history()
+            if failed:
+                st.error(f"Translation to {', '.join(failed)} failed, please try again in a moment.")
+            if truncated:
+                st.warning(f"The translation to {', '.join(truncated)} was cut off because it got too long.")
+            if not failed and not truncated:
+                st.success("Translation complete!")
+
+        else:
+            truncated = False
+            # Text already in the target language is returned as is, without calling the LLM
+            if detect_language(input_text) == selected_language:
+                response = input_text
+            else:
+                # Reuse a cached translation of the same (or near-identical) text if there is one
+                query = None
+                response = lookup_translation(selected_language, input_text)
+                if response is None:
+                    query = embed(input_text)
+                    response = lookup_similar_translation(selected_language, query)
+            if response is None:
+                # Stream the Langchain chain output with the user's input and selected language
+                # st.write_stream returns the full accumulated string once the stream ends
+                chain = get_translation_chain(input_tokens, selected_language)
+                response_metadata = {}
+                with st.chat_message("assistant", avatar="✨"):
+                    response = st.write_stream(stream_text(chain.stream({
+                        "target_language": selected_language,
+                        "input": input_text
+                    }), response_metadata))
+                # Output cut off at max_tokens is shown but never cached
+                truncated = hit_length_limit(response_metadata)
+                if not truncated:
+                    store_translation(selected_language, input_text, response, query)
 
             # Store the translation in session state for history display
-            st.session_state.translations.insert(0, { # Insert at beginning to show newest first
+            st.session_state.translations.appendleft({ # Add at the beginning to show newest first
                 "input": input_text,
                 "output": response,
                 "target_lang": selected_language,
                 "timestamp": datetime.now().strftime("%I:%M %p, %b %d, %Y") # Add detailed timestamp
             })
-            st.success("Translation complete!")
+            save_translation_history()
+            if truncated:
+                st.warning("The translation was cut off because it got too long.")
+            else:
+                st.success("Translation complete!")
 
-        except Exception as e:
-            st.error(f"An error occurred during translation: {e}")
-            st.info("Please ensure your Groq API Key is valid and try again.")
-elif translate_button and not input_text:
-    st.warning("Please enter some text to translate before clicking 'Translate'!")
+    except Exception as e:
+        st.error(f"An error occurred during translation: {e}")
+        st.info("Please ensure your Groq API Key is valid and try again.")
 
 # --- Display Translation History ---
-if st.session_state.translations:
-    st.markdown("---")
-    st.subheader("📚 Recent Translations")
-    st.markdown("---") # Separator before history starts
-
-    # Display each translation from history
-    for i, entry in enumerate(st.session_state.translations):
-        # Using Streamlit's chat message-like UI for better visual separation and engagement
-        with st.container(border=True): # Use a container to group related history items
-            st.markdown(f"**⏰ {entry['timestamp']}**")
-            st.markdown(f"**🎯 Target Language:** {entry['target_lang']}")
-            
-            # Display original input using a 'user' bubble style
-            with st.chat_message("user", avatar="💬"): # Custom emoji avatar
-                st.markdown(f"**Original Text:**\n\n__{entry['input']}__")
-
-            # Display translated output using an 'assistant' bubble style
-            with st.chat_message("assistant", avatar="✨"): # Custom emoji avatar
-                st.markdown(f"**Translated Text:**\n\n**{entry['output']}**")
-            
-            if i < len(st.session_state.translations) - 1:
-                st.markdown("---") # Separator between individual history entries
\ No newline at end of file
+def render_translation(entry, separator):
+    # Using Streamlit's chat message-like UI for better visual separation and engagement
+    with st.container(border=True): # Use a container to group related history items
+        st.markdown(f"**⏰ {entry['timestamp']}**")
+        st.markdown(f"**🎯 Target Language:** {entry['target_lang']}")
+
+        # Display original input using a 'user' bubble style
+        with st.chat_message("user", avatar="💬"): # Custom emoji avatar
+            st.markdown(f"**Original Text:**\n\n__{entry['input']}__")
+
+        # Display translated output using an 'assistant' bubble style
+        with st.chat_message("assistant", avatar="✨"): # Custom emoji avatar
+            st.markdown(f"**Translated Text:**\n\n**{entry['output']}**")
+
+        if separator:
+            st.markdown("---") # Separator between individual history entries
+
+# Wrapped in st.fragment (Streamlit >= 1.37) so the "older translations" toggle below
+# redraws just the history list instead of rerunning the translator
+@st.fragment
+def render_history():
+    if st.session_state.translations:
+        st.markdown("---")
+        st.subheader("📚 Recent Translations")
+        st.markdown("---") # Separator before history starts
+
+        # Only the newest entries are rendered by default; older ones only once the toggle is on
+        # This keeps the per-rerun rendering work constant as the history grows
+        history = list(st.session_state.translations)
+        recent = history[:RECENT_TRANSLATIONS_SHOWN]
+        older = history[RECENT_TRANSLATIONS_SHOWN:]
+
+        for i, entry in enumerate(recent):
+            render_translation(entry, separator=i < len(recent) - 1)
+
+        if older and st.toggle(f"Show {len(older)} older translations", key="show_older_translations"):
+            for i, entry in enumerate(older):
+                render_translation(entry, separator=i < len(older) - 1)
+
+render_history()